@@ -1,17 +1,21 @@
+from functools import lru_cache
 
-def rgb_to_hex(r: float, g: float, b: float) -> str:
+# Two-digit hex code of every channel value
+_HEX = tuple(f'{i:02x}' for i in range(256))
+
+def rgb_to_hex(r: int, g: int, b: int) -> str:
     """
     Convert an RGB color into a Hex color code.
 
     Args:
-        r (float): The red channel component.
-        g (float): The green channel component.
-        b (float): The blue channel component.
+        r (int): The red channel component.
+        g (int): The green channel component.
+        b (int): The blue channel component.
 
     Returns:
         str: Resulting hex color code.
     """
-    return f'#{r:02x}{g:02x}{b:02x}'
+    return '#' + _HEX[r] + _HEX[g] + _HEX[b]
 
 def clamp(val: float, minimum: int = 0, maximum: int = 255):
     """
@@ -31,6 +35,7 @@ def clamp(val: float, minimum: int = 0, maximum: int = 255):
         return int(maximum)
     return int(val)
 
+@lru_cache(maxsize=256)
 def colorscale(hexstr: str, scale_factor: float = None) -> str:
     """
     Scales a hex string by ``scale_factor``. Returns scaled hex string.
@@ -61,8 +66,8 @@ def colorscale(hexstr: str, scale_factor: float = None) -> str:
     if scale_factor < 0 or len(hexstr) != 6:
         return hexstr
 
-    r = clamp(r * scale_factor)
-    g = clamp(g * scale_factor)
-    b = clamp(b * scale_factor)
+    r = min(255, max(0, int(r * scale_factor)))
+    g = min(255, max(0, int(g * scale_factor)))
+    b = min(255, max(0, int(b * scale_factor)))
 
-    return "#%02x%02x%02x" % (r, g, b)
+    return '#' + _HEX[r] + _HEX[g] + _HEX[b]
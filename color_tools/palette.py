@@ -0,0 +1,33 @@
+"""
+Module used to extract the most frequent colors of an image.
+"""
+
+from PIL import Image
+from color_tools import hex_tools as HEX
+
+PALETTE_SAMPLE_SIZE = (256, 256)
+
+def extract_palette(path: str, count: int = 14) -> list[str]:
+    """
+    Extract the most frequent colors of an image file.
+
+    The colors of a downsampled copy of the image are reduced to ``count``
+    colors with Pillow's fast octree quantizer, then ordered by the number
+    of pixels mapped to each of them.
+
+    Args:
+        path (str): Path to the image file.
+        count (int, optional): Number of colors to extract. Defaults to 14.
+
+    Returns:
+        list[str]: Hex color codes, from the most to the least frequent.
+    """
+    with Image.open(path) as image:
+        # JPEGs are decoded at reduced scale, other images are box-reduced
+        # before the final bilinear resample (reducing_gap)
+        image.thumbnail(PALETTE_SAMPLE_SIZE, Image.Resampling.BILINEAR)
+        quantized = image.convert('RGB').quantize(colors=count, method=Image.Quantize.FASTOCTREE)
+
+    palette = quantized.getpalette()
+    colors = sorted(quantized.getcolors(count), reverse=True)   # (pixel count, index)
+    return [HEX.rgb_to_hex(*palette[index * 3:index * 3 + 3]) for _, index in colors]
@@ -0,0 +1,147 @@
+"""
+Per-pixel kernels used by the image manipulator.
+
+The kernels are JIT-compiled with Numba when it is installed,
+otherwise an equivalent NumPy implementation is used.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# ITU-R 601-2 luma transform, as used by Pillow's RGB -> L conversion
+LUMA_WEIGHTS = np.array((0.299, 0.587, 0.114), dtype=np.float32)
+
+
+def color_matrix(saturation: float) -> np.ndarray:
+    """
+    Build the RGB color matrix of a saturation change, a blend of every
+    pixel with its grayscale value, as done by ``ImageEnhance.Color``.
+
+    Args:
+        saturation (float): Saturation factor, 1 keeps the original colors.
+
+    Returns:
+        np.ndarray: 3x3 matrix mapping input RGB values to output RGB values.
+    """
+    luma = np.tile(LUMA_WEIGHTS.astype(np.float64), (3, 1))
+    return saturation * np.identity(3) + (1 - saturation) * luma
+
+
+def _fused_pointwise_numpy(pixels: np.ndarray, brightness: float, matrix: np.ndarray,
+                           grayscale: bool, invert: bool, sepia: bool, sepia_lut: np.ndarray,
+                           balance_matrix: np.ndarray | None) -> np.ndarray:
+    rgb = pixels[..., :3] * np.float32(brightness)
+    np.clip(rgb, 0, 255, out=rgb)
+    rgb = rgb @ matrix.T.astype(np.float32)
+    np.clip(rgb, 0, 255, out=rgb)
+
+    if grayscale:
+        rgb = np.repeat((rgb @ LUMA_WEIGHTS)[..., None], 3, axis=-1)
+    if invert:
+        np.subtract(255, rgb, out=rgb)
+    if sepia:
+        gray = (rgb @ LUMA_WEIGHTS + 0.5).astype(np.uint8)
+        rgb = sepia_lut[gray].astype(np.float32)
+    if balance_matrix is not None:
+        rgb = rgb @ balance_matrix.T.astype(np.float32)
+        np.clip(rgb, 0, 255, out=rgb)
+
+    rgb += 0.5
+    return rgb.astype(np.uint8)
+
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _fused_pointwise_jit(pixels, out, brightness, matrix, grayscale, invert, sepia,
+                             sepia_lut, balance_matrix, balance):
+        for i in prange(pixels.shape[0]):
+            for j in range(pixels.shape[1]):
+                r_in = min(float(pixels[i, j, 0]) * brightness, 255.0)
+                g_in = min(float(pixels[i, j, 1]) * brightness, 255.0)
+                b_in = min(float(pixels[i, j, 2]) * brightness, 255.0)
+                r = matrix[0, 0] * r_in + matrix[0, 1] * g_in + matrix[0, 2] * b_in
+                g = matrix[1, 0] * r_in + matrix[1, 1] * g_in + matrix[1, 2] * b_in
+                b = matrix[2, 0] * r_in + matrix[2, 1] * g_in + matrix[2, 2] * b_in
+                r = min(max(r, 0.0), 255.0)
+                g = min(max(g, 0.0), 255.0)
+                b = min(max(b, 0.0), 255.0)
+
+                if grayscale:
+                    r = g = b = 0.299 * r + 0.587 * g + 0.114 * b
+                if invert:
+                    r, g, b = 255.0 - r, 255.0 - g, 255.0 - b
+                if sepia:
+                    gray = int(0.299 * r + 0.587 * g + 0.114 * b + 0.5)
+                    r = float(sepia_lut[gray, 0])
+                    g = float(sepia_lut[gray, 1])
+                    b = float(sepia_lut[gray, 2])
+                if balance:
+                    r_in, g_in, b_in = r, g, b
+                    r = balance_matrix[0, 0] * r_in + balance_matrix[0, 1] * g_in + balance_matrix[0, 2] * b_in
+                    g = balance_matrix[1, 0] * r_in + balance_matrix[1, 1] * g_in + balance_matrix[1, 2] * b_in
+                    b = balance_matrix[2, 0] * r_in + balance_matrix[2, 1] * g_in + balance_matrix[2, 2] * b_in
+                    r = min(max(r, 0.0), 255.0)
+                    g = min(max(g, 0.0), 255.0)
+                    b = min(max(b, 0.0), 255.0)
+
+                out[i, j, 0] = np.uint8(r + 0.5)
+                out[i, j, 1] = np.uint8(g + 0.5)
+                out[i, j, 2] = np.uint8(b + 0.5)
+
+
+def fused_pointwise(pixels: np.ndarray, brightness: float, matrix: np.ndarray,
+                    grayscale: bool, invert: bool, sepia: bool, sepia_lut: np.ndarray,
+                    balance_matrix: np.ndarray | None = None) -> np.ndarray:
+    """
+    Apply all per-pixel color adjustments to an image's pixels in a single
+    pass, instead of producing an intermediate image for each of them.
+
+    The adjustments are applied in the same order as the separate filters,
+    clamping the values after each of them: brightness, the color matrix
+    (see ``color_matrix``), grayscale, inversion, the sepia lookup and the
+    balance color matrix.
+
+    Args:
+        pixels (np.ndarray): uint8 array of shape (H, W, C), only the first
+        three (RGB) channels are used.
+        brightness (float): Brightness factor, 1 keeps the original brightness.
+        matrix (np.ndarray): 3x3 RGB color matrix, from ``color_matrix``.
+        grayscale (bool): Convert the pixels to grayscale.
+        invert (bool): Invert the pixel values.
+        sepia (bool): Map the pixels to sepia tones.
+        sepia_lut (np.ndarray): uint8 array of shape (256, 3), the sepia color
+        of every gray level.
+        balance_matrix (np.ndarray | None, optional): 3x3 RGB color matrix
+        applied last, from ``color_matrix``. Defaults to None.
+
+    Returns:
+        np.ndarray: uint8 array of shape (H, W, 3) with the resulting pixels.
+    """
+    if njit is None:
+        return _fused_pointwise_numpy(pixels, brightness, matrix, grayscale, invert,
+                                      sepia, sepia_lut, balance_matrix)
+
+    balance = balance_matrix is not None
+    if not balance:
+        balance_matrix = np.identity(3)
+    # Always pass a read-only view, Numba compiles writable and read-only
+    # inputs separately and only the read-only version is warmed up
+    pixels = np.ascontiguousarray(pixels).view()
+    pixels.setflags(write=False)
+    out = np.empty(pixels.shape[:2] + (3,), dtype=np.uint8)
+    _fused_pointwise_jit(pixels, out, float(brightness),
+                         np.ascontiguousarray(matrix, dtype=np.float64),
+                         bool(grayscale), bool(invert), bool(sepia), sepia_lut,
+                         np.ascontiguousarray(balance_matrix, dtype=np.float64), balance)
+    return out
+
+
+# Compile the kernel on import rather than on the first edit
+if njit is not None:
+    _warmup_pixels = np.zeros((1, 1, 3), dtype=np.uint8)
+    fused_pointwise(_warmup_pixels, 1.0, np.identity(3), False, False, False,
+                    np.zeros((256, 3), dtype=np.uint8))
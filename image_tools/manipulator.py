@@ -2,27 +2,37 @@
 Module responsible for providing image manipulation functionalities.
 """
 
+from functools import lru_cache
+import math
 from settings import *
 from PIL import Image, ImageOps, ImageEnhance, ImageFilter
 import numpy as np
-
-def sepia_palette() -> list[int]:
-    """
-    Generate a sepia palette to apply to images.
-
-    Returns:
-        list[int]: the resulting palette.
-    """
-    BASE_COLOR = (255, 240, 192)
-    palette = []
-    r, g, b = BASE_COLOR
-    for i in range(255):
-        new_red = r * i // 255
-        new_green = g * i // 255
-        new_blue = b * i // 255
-        palette.extend((new_red, new_green, new_blue))
-
-    return palette
+from image_tools.kernels import color_matrix, fused_pointwise
+
+SEPIA_BASE_COLOR = (255, 240, 192)
+
+# Row ``i`` is the sepia base color scaled by ``i / 255``, used as a
+# lookup table from gray levels to sepia RGB values.
+_SEPIA_LUT = (
+    np.array(SEPIA_BASE_COLOR, dtype=np.uint32)[None, :]
+    * np.arange(256, dtype=np.uint32)[:, None] // 255
+).astype(np.uint8)
+# Same table as an (immutable) image palette, for gray images
+_SEPIA_PALETTE = _SEPIA_LUT.tobytes()
+
+# Image modes handled by the fused per-pixel color pass
+POINTWISE_MODES = ('RGB', 'RGBA')
+# Lossless transposes for right-angle rotations and flips
+RIGHT_ANGLE_ROTATIONS = {
+    90: Image.Transpose.ROTATE_90,
+    180: Image.Transpose.ROTATE_180,
+    270: Image.Transpose.ROTATE_270,
+}
+FLIP_TRANSPOSES = {
+    'X': Image.Transpose.FLIP_LEFT_RIGHT,
+    'Y': Image.Transpose.FLIP_TOP_BOTTOM,
+    'Both': Image.Transpose.ROTATE_180,
+}
 
 def sepia_filter(image: Image) -> Image:
     """
@@ -34,58 +44,109 @@ def sepia_filter(image: Image) -> Image:
     Returns:
     A PIL.Image object in sepia tone.
     """
-    sepia = sepia_palette()
+    # Gray levels as palette indices, converted back to RGB in C
     gray = image.convert("L")
-    gray.putpalette(sepia)
+    gray.putpalette(_SEPIA_PALETTE)
 
     return gray.convert("RGB")
 
 
+@lru_cache(maxsize=1)
+def contrast_lut(factor: float) -> list[int]:
+    """
+    Build a lookup table that stretches pixel values away from
+    mid-gray by a given factor. The last table is cached, since
+    it only changes when the contrast slider moves.
+
+    Args:
+        factor (float): Contrast factor, 1 keeps the original contrast.
+
+    Returns:
+        list[int]: 256-entry lookup table.
+    """
+    lut = np.clip(np.rint((np.arange(256) - 128) * factor + 128), 0, 255)
+    return lut.astype(np.uint8).tolist()
+
+
 class ImageManipulator:
     """
     Class containing all image-manipulation methods used in the app.
     """
     def __init__(self, image_file: Image.Image) -> None:
         self.used_image = image_file
-        if self.used_image.mode == 'P':
-            self.used_image = self.used_image.convert('RGB')
-
-
-    def rotate_image(self, rotation_angle: float) -> None:
-        """
-        Apply a rotation by a given angle to the image.
 
-        Args:
-            rotation_angle (float): rotation angle.
+    def _ensure_rgb(self) -> None:
         """
-        if rotation_angle != ROTATE_DEFAULT:
-            self.used_image = self.used_image.rotate(angle=rotation_angle)
-
-    def zoom_image(self, zoom_amount: float) -> None:
+        Convert palette images to RGB. Only done before operations that cannot
+        work on palette indices, images left at their defaults stay indexed.
         """
-        Zoom the image by a given amount.
-
-        Args:
-            zoom_amount (float): The given zoom amount.
-        """
-        if zoom_amount != ZOOM_DEFAULT:
-            self.used_image = ImageOps.crop(self.used_image, border=zoom_amount)
+        if self.used_image.mode == 'P':
+            self.used_image = self.used_image.convert('RGB')
 
-    def flip_image(self, flip_option: str) -> None:
+    def apply_geometry(self, rotation_angle: float, zoom_amount: float, flip_option: str) -> None:
         """
-        Flip the image horizontally, vertically, or both ways.
+        Rotate, zoom and flip the image. Right-angle rotations only move
+        pixels, with a crop and transposes. Other angles are done with a
+        single affine transform, resampling the image once instead of once
+        per operation.
 
         Args:
+            rotation_angle (float): Counter-clockwise rotation angle in degrees,
+            around the image center, keeping the image size.
+            zoom_amount (float): Number of pixels cropped from every side of the image.
             flip_option (str): The flip type, can be 'X' for horizontal,
             'Y' for vertical, and 'Both' for both directions.
         """
-        if flip_option != 'None':
-            mirror = flip_option in ('X', 'Both')
-            flip = flip_option in ('Y', 'Both')
-            if mirror:
-                self.used_image = ImageOps.mirror(self.used_image)
-            if flip:
-                self.used_image = ImageOps.flip(self.used_image)
+        width, height = self.used_image.size
+        crop = round(zoom_amount)
+        new_width, new_height = max(1, width - 2 * crop), max(1, height - 2 * crop)
+
+        if rotation_angle % 90 == 0:
+            angle = int(rotation_angle % 360)
+            if angle in RIGHT_ANGLE_ROTATIONS:
+                self.used_image = self.used_image.transpose(RIGHT_ANGLE_ROTATIONS[angle])
+
+            # The image keeps its size, quarter turns of non-square images
+            # are cropped (or padded with black) around the center. Odd size
+            # differences are rounded the same way as Image.rotate
+            left = (self.used_image.width - width + (angle == 90)) // 2 + crop
+            top = (self.used_image.height - height + (angle == 270)) // 2 + crop
+            box = (left, top, left + new_width, top + new_height)
+            if box != (0, 0, *self.used_image.size):
+                if (left < 0 or top < 0 or box[2] > self.used_image.width
+                        or box[3] > self.used_image.height):
+                    self._ensure_rgb()   # Padding of palette images uses index 0
+                self.used_image = self.used_image.crop(box)
+
+            if flip_option in FLIP_TRANSPOSES:
+                self.used_image = self.used_image.transpose(FLIP_TRANSPOSES[flip_option])
+            return
+
+        # Transforms of palette images fill exposed areas with palette
+        # index 0 instead of black, and can only use nearest resampling
+        self._ensure_rgb()
+
+        # Output pixel -> input pixel: undo the flip, undo the crop offset,
+        # then undo the rotation around the original image center
+        scale_x = -1 if flip_option in ('X', 'Both') else 1
+        scale_y = -1 if flip_option in ('Y', 'Both') else 1
+        offset_x = new_width if scale_x < 0 else 0
+        offset_y = new_height if scale_y < 0 else 0
+
+        angle = -math.radians(rotation_angle)
+        cos, sin = math.cos(angle), math.sin(angle)
+        center_x, center_y = width / 2, height / 2
+        shift_x = offset_x + crop - center_x
+        shift_y = offset_y + crop - center_y
+
+        matrix = (
+            cos * scale_x, sin * scale_y, cos * shift_x + sin * shift_y + center_x,
+            -sin * scale_x, cos * scale_y, -sin * shift_x + cos * shift_y + center_y,
+        )
+        self.used_image = self.used_image.transform(
+            (new_width, new_height), Image.Transform.AFFINE, matrix,
+            resample=Image.Resampling.BILINEAR,
+        )
 
     def apply_brightness(self, brightness_value: float) -> None:
         """
@@ -96,6 +157,7 @@ class ImageManipulator:
             the image becomes completely black.
         """
         if brightness_value != BRIGHTNESS_DEFAULT:
+            self._ensure_rgb()
             brightness_enhancer = ImageEnhance.Brightness(self.used_image)
             self.used_image =  brightness_enhancer.enhance(brightness_value)
 
@@ -108,9 +170,68 @@ class ImageManipulator:
             the image becomes grayscale.
         """
         if vibrance_value != VIBRANCE_DEFAULT:
+            self._ensure_rgb()
             brightness_enhancer = ImageEnhance.Color(self.used_image)
             self.used_image =  brightness_enhancer.enhance(vibrance_value)
 
+    def apply_pointwise(self, brightness_value: float, vibrance_value: float,
+                        grayscale_flag: bool, invert_flag: bool, sepia_flag: bool,
+                        balance_value: float) -> None:
+        """
+        Apply brightness, vibrance, grayscale, negative, sepia and balance
+        in a single pass over the image pixels.
+
+        Images that are not RGB(A) fall back to applying each filter separately,
+        as do RGB images with a single filter, for which Pillow's own
+        filter is faster than the fused pass.
+
+        Args:
+            brightness_value (float): New brightness value.
+            vibrance_value (float): New vibrance value.
+            grayscale_flag (bool): Set to True, if the grayscale filter is chosen.
+            invert_flag (bool): Set to True, if the negative filter is chosen.
+            sepia_flag (bool): Set to True, if the sepia filter is chosen.
+            balance_value (float): Used balance value.
+        """
+        active_filters = sum((
+            brightness_value != BRIGHTNESS_DEFAULT, vibrance_value != VIBRANCE_DEFAULT,
+            bool(grayscale_flag), bool(invert_flag), bool(sepia_flag),
+            balance_value != BALANCE_DEFAULT,
+        ))
+        if not active_filters:
+            return
+
+        self._ensure_rgb()
+        # The separate filters handle alpha differently, so RGBA images
+        # always use the fused pass
+        if (self.used_image.mode not in POINTWISE_MODES
+                or (active_filters == 1 and self.used_image.mode == 'RGB')):
+            self.apply_brightness(brightness_value)
+            self.apply_vibrance(vibrance_value)
+            self.apply_grayscale(grayscale_flag)
+            self.invert_colors(invert_flag)
+            self.apply_sepia(sepia_flag)
+            self.change_balance(balance_value)
+            return
+
+        # Vibrance and balance both blend with the grayscale image, balance
+        # is the last step (after sepia) so each has its own matrix
+        balance_matrix = None
+        if balance_value != BALANCE_DEFAULT:
+            balance_matrix = color_matrix(balance_value)
+        result = fused_pointwise(np.asarray(self.used_image), brightness_value,
+                                 color_matrix(vibrance_value), grayscale_flag,
+                                 invert_flag, sepia_flag, _SEPIA_LUT, balance_matrix)
+
+        if grayscale_flag and not sepia_flag:
+            self.used_image = Image.fromarray(np.ascontiguousarray(result[..., 0]))
+            return
+
+        alpha = self.used_image.getchannel('A') if self.used_image.mode == 'RGBA' else None
+        self.used_image = Image.fromarray(result)
+        if alpha is not None:
+            self.used_image.putalpha(alpha)
+
     def apply_grayscale(self, grayscale_flag: bool) -> None:
         """
         Convert the image to grayscale (Black and White).
@@ -129,6 +250,7 @@ class ImageManipulator:
             invert_flag (bool): Set to True, if the filter is chosen.
         """
         if invert_flag:
+            self._ensure_rgb()
             try:
                 self.used_image = ImageOps.invert(self.used_image)
             except:
@@ -147,13 +269,18 @@ class ImageManipulator:
     def apply_4color_filter(self, four_col_flag: bool) -> None:
         """
         Apply a 4-color filter to the image i.e. display the image using only 4 colors,
-        extracted from the image by an algorithm implemented in Pillow.
+        extracted from the image by an algorithm implemented in Pillow
+        (``FOUR_COLOR_METHOD``, dithered if ``FOUR_COLOR_DITHER`` is set).
 
         Args:
             four_col_flag (bool): Set to True, if the filter is chosen.
         """
         if four_col_flag:
-            self.used_image = self.used_image.convert("P", palette=Image.ADAPTIVE, colors=4)
+            self._ensure_rgb()
+            dither = Image.Dither.FLOYDSTEINBERG if FOUR_COLOR_DITHER else Image.Dither.NONE
+            self.used_image = self.used_image.quantize(
+                colors=4, method=Image.Quantize[FOUR_COLOR_METHOD], dither=dither
+            ).convert("RGB")
 
     def blur_image(self, blur_value: float) -> None:
         """
@@ -163,6 +290,7 @@ class ImageManipulator:
             blur_value (float): Blur intensity.
         """
         if blur_value != BLUR_DEFAULT:
+            self._ensure_rgb()
             blur_filter = ImageFilter.GaussianBlur(blur_value)
             self.used_image = self.used_image.filter(blur_filter)
 
@@ -171,11 +299,17 @@ class ImageManipulator:
         Change the image contrast by a given amount.
 
         Args:
-            contrast_value (float): Used contrast value.
+            contrast_value (float): Used contrast value, each step
+            increases the contrast by ``CONTRAST_STEP``.
         """
         if contrast_value != CONTRAST_DEFAULT:
-            contrast_filter = ImageFilter.UnsharpMask(contrast_value)
-            self.used_image = self.used_image.filter(contrast_filter)
+            self._ensure_rgb()
+            lut = contrast_lut(1 + contrast_value * CONTRAST_STEP)
+            identity = list(range(256))
+            table = []
+            for band in self.used_image.getbands():
+                table += identity if band == 'A' else lut
+            self.used_image = self.used_image.point(table)
 
     def change_balance(self, balance_value: float) -> None:
         """
@@ -185,6 +319,7 @@ class ImageManipulator:
             balance_value (float): Used balance value.
         """
         if balance_value != BALANCE_DEFAULT:
+            self._ensure_rgb()
             balance_enhancer = ImageEnhance.Color(self.used_image)
             self.used_image = balance_enhancer.enhance(balance_value)
 
@@ -229,6 +364,7 @@ class ImageManipulator:
                 applied_effect = ImageFilter.EDGE_ENHANCE
 
         if applied_effect:
+            self._ensure_rgb()
             self.used_image = self.used_image.filter(applied_effect)
 
     @property
@@ -5,11 +5,17 @@ such as EXIF, GPS, and TIFF tags.
 """
 
 from PIL import Image
-from PIL.ExifTags import TAGS, GPSTAGS
-from GPSPhoto import gpsphoto
+from PIL.ExifTags import TAGS, GPSTAGS, IFD
 import os
 
 ONE_MEGABYTE = 1048576
+SEPARATOR = '-' * 45
+ENTROPY_CACHE_SIZE = 8
+# Formats that can carry EXIF tags, metadata isn't parsed for other formats
+EXIF_FORMATS = frozenset(('JPEG', 'MPO', 'TIFF', 'PNG', 'WEBP', 'HEIF', 'HEIC', 'AVIF'))
+
+# Image entropy by (file path, modification time), oldest entries first
+_ENTROPY_CACHE: dict[tuple[str, float], float] = {}
 
 def get_image(image: str | Image.Image) -> Image.Image:
     """
@@ -24,8 +30,41 @@ def get_image(image: str | Image.Image) -> Image.Image:
     """
     return Image.open(image) if isinstance(image, str) else image
 
+def to_degrees(dms: tuple, ref: str) -> float:
+    """
+    Convert a GPS coordinate from (degrees, minutes, seconds) to decimal degrees.
+
+    Args:
+        dms (tuple): Degrees, minutes and seconds of the coordinate.
+        ref (str): Hemisphere reference ('N', 'S', 'E' or 'W').
+
+    Returns:
+        float: The coordinate in decimal degrees, negative for south and west.
+    """
+    degrees = float(dms[0]) + float(dms[1]) / 60 + float(dms[2]) / 3600
+    return -degrees if ref in ('S', 'W') else degrees
+
 def get_bits(image: Image.Image) -> str:
-    return str(image.bits) if "bits" in image.__dir__() else None
+    return str(image.bits) if hasattr(image, "bits") else None
+
+def get_entropy(image: Image.Image, mtime: float) -> float:
+    """
+    Get the entropy of an image file. The entropy is a full pass over the
+    image, so it's cached for the last ``ENTROPY_CACHE_SIZE`` files.
+
+    Args:
+        image (Image.Image): The provided image file.
+        mtime (float): Modification time of the file.
+
+    Returns:
+        float: The image entropy.
+    """
+    key = (image.filename, mtime)
+    if key not in _ENTROPY_CACHE:
+        if len(_ENTROPY_CACHE) >= ENTROPY_CACHE_SIZE:
+            del _ENTROPY_CACHE[next(iter(_ENTROPY_CACHE))]
+        _ENTROPY_CACHE[key] = image.entropy()
+    return _ENTROPY_CACHE[key]
 
 def format_size(size: int) -> str:
     """
@@ -45,30 +84,75 @@ def format_size(size: int) -> str:
         result = size / 1024
         return f"{result:.2f} KB"
 
-def get_image_info(image: Image.Image) -> str:
+def get_image_stats(image: Image.Image) -> dict:
     """
-    Get multiple attributes of the image file as a string.
+    Collect the attributes of an image file shown in the info panel,
+    so they are read from disk once when the image is opened.
 
     Args:
         image (Image.Image): The provided image file.
 
     Returns:
-        str: image information as a multi-line string
+        dict: File path, size in bytes, modification time, format,
+        format description, number of bands, dimensions, bits and entropy.
+    """
+    file_stat = os.stat(image.filename)
+    return {
+        "path": image.filename,
+        "size": file_stat.st_size,
+        "mtime": file_stat.st_mtime,
+        "format": image.format,
+        "format_desc": image.format_description if image.format else None,
+        "bands": len(image.getbands()),
+        "wh": image.size,
+        "bits": get_bits(image),
+        "entropy": get_entropy(image, file_stat.st_mtime),
+    }
+
+def get_image_info(stats: dict) -> str:
     """
-    bit_count = get_bits(image)
-    bytes = os.path.getsize(image.filename)
-    info_str = f"File: \"{image.filename}\"\n"
-    info_str += f"Size: {format_size(bytes)}\n"
-    if bit_count: info_str += f"Number of bits: {bit_count}\n"
-    info_str += f"Entropy: {image.entropy():.3f}\n"
-    if image.format:
-        info_str += f"Format: {image.format} ({image.format_description})\n"
+    Get multiple attributes of the image file as a string.
+
+    Args:
+        stats (dict): Image attributes, as returned by ``get_image_stats``.
 
-    info_str += f"Number of bands: {len(image.getbands())}.\nSize: {image.size[0]}x{image.size[1]}"
+    Returns:
+        str: image information as a multi-line string
+    """
+    info_str = f"File: \"{stats['path']}\"\n"
+    info_str += f"Size: {format_size(stats['size'])}\n"
+    if stats['bits']: info_str += f"Number of bits: {stats['bits']}\n"
+    info_str += f"Entropy: {stats['entropy']:.3f}\n"
+    if stats['format']:
+        info_str += f"Format: {stats['format']} ({stats['format_desc']})\n"
+
+    width, height = stats['wh']
+    info_str += f"Number of bands: {stats['bands']}.\nSize: {width}x{height}"
     return info_str
 
 
-def get_metadata(image: str | Image.Image) -> tuple[str, str, str]:
+def read_exif(image: Image.Image) -> Image.Exif:
+    """
+    Parse the EXIF block of an image. If the block was already read from the
+    file (e.g. the APP1 segment of a JPEG), it's parsed directly, skipping the
+    XMP scan for orientation done by ``Image.getexif``.
+
+    Args:
+        image (Image.Image): The provided image file.
+
+    Returns:
+        Image.Exif: The parsed EXIF tags.
+    """
+    raw_exif = image.info.get('exif')
+    if not isinstance(raw_exif, bytes):
+        return image.getexif()
+
+    exif = Image.Exif()
+    exif.load(raw_exif)
+    return exif
+
+
+def get_metadata(image: str | Image.Image) -> tuple[str, str]:
     """
     Extract different metadata types from an image.
 
@@ -76,34 +160,38 @@ def get_metadata(image: str | Image.Image) -> tuple[str, str, str]:
         image (str | Image.Image): Pillow Image instance, or a path to an image.
 
     Returns:
-        tuple[str, str, str]: EXIF, GPS, and TIFF data as strings.
+        tuple[str, str]: EXIF & GPS, and TIFF data as strings, empty for
+        formats outside ``EXIF_FORMATS``.
     """
-    exif_table = {}
     image_file = get_image(image)
-    info = image_file.getexif()
+    if image_file.format not in EXIF_FORMATS:
+        return '', ''
+
+    info = read_exif(image_file)
+    get_tag = TAGS.get
 
     # Collect EXIF data from image
-    for tag, value in info.items():
-        decoded = TAGS.get(tag, tag)
-        exif_table[decoded] = value
+    exif_table = {get_tag(tag, tag): value for tag, value in info.items()}
 
-    # Collect GPS data from image (if any)
-    gps_info = {}
+    # Collect GPS data from image (if any), from the already parsed EXIF block
     if 'GPSInfo' in exif_table:
-        gps_info = gpsphoto.getGPSData(image_file.filename)
-
-    for key, value in gps_info.items():
-        exif_table[key] = value
+        get_gps_tag = GPSTAGS.get
+        gps_info = {
+            get_gps_tag(tag, tag): value for tag, value in info.get_ifd(IFD.GPSInfo).items()
+        }
+        for axis in ('Latitude', 'Longitude'):
+            if f'GPS{axis}' in gps_info and f'GPS{axis}Ref' in gps_info:
+                gps_info[axis] = to_degrees(gps_info[f'GPS{axis}'], gps_info[f'GPS{axis}Ref'])
+        exif_table.update(gps_info)
 
     tiff_metadata = {}
-    if image_file.format.lower() == 'tiff':
-        for tag in image_file.tag.items():
-            tiff_metadata[TAGS.get(tag[0])] = tag[1]
+    if image_file.format == 'TIFF':
+        tiff_metadata = {get_tag(tag): value for tag, value in image_file.tag.items()}
 
     return stringfy(exif_table, tiff_metadata)
 
 
-def stringfy(exif_table: dict, tiff_metadata: dict) -> tuple[str, str, str]:
+def stringfy(exif_table: dict, tiff_metadata: dict) -> tuple[str, str]:
     """
     Parse tags tables and return them as strings.
 
@@ -112,15 +200,11 @@ def stringfy(exif_table: dict, tiff_metadata: dict) -> tuple[str, str, str]:
         tiff_metadata (dict): A ``dict`` of TIFF image data (for ``.tiff`` images only).
 
     Returns:
-        tuple[str, str, str]: Strings containing all data.
+        tuple[str, str]: Strings containing all data.
     """
-    EXIF_STRING = ""
-    for key, val in exif_table.items():
-        EXIF_STRING += f'{str(key)}: {str(val)}\n'
-        EXIF_STRING += f'---------------------------------------------\n'
-
-    TIFF_STRING = ""
-    for key, val in tiff_metadata.items():
-        TIFF_STRING += f'{str(key)}: {str(val)}\n'
+    EXIF_STRING = "".join(
+        f'{key}: {val}\n{SEPARATOR}\n' for key, val in exif_table.items()
+    )
+    TIFF_STRING = "".join(f'{key}: {val}\n' for key, val in tiff_metadata.items())
 
-    return EXIF_STRING, TIFF_STRING
\ No newline at end of file
+    return EXIF_STRING, TIFF_STRING
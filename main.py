@@ -4,9 +4,32 @@ from PIL import Image, ImageTk, ImageOps
 # App-specific imports
 from image_widgets import ImageImport, ImageOutput, CloseOutputButton
 from image_tools.manipulator import ImageManipulator
+import image_tools.metadata as Metadata
 from menu import Menu
 from settings import *
 
+# Rendering stages, each with the manipulator methods it applies (in order)
+# and the editor parameters passed to each of them. The output of every
+# stage is cached when editing, so changing a parameter only re-runs
+# its own stage and the ones after it.
+PIPELINE = (
+    ('geometry', (
+        ('apply_geometry', ('rotate', 'zoom', 'flip')),
+    )),
+    ('color', (
+        ('apply_pointwise', ('brightness', 'vibrance', 'grayscale', 'invert', 'sepia', 'balance')),
+        ('apply_4color_filter', ('4-color',)),
+    )),
+    ('effects', (
+        ('blur_image', ('blur',)),
+        ('change_contrast', ('contrast',)),
+        ('change_hue', ('hue',)),
+        ('apply_effect', ('effect',)),
+    )),
+)
+# Parameters measured in pixels, scaled along with the edited image
+PIXEL_PARAMETERS = ('zoom', 'blur')
+
 class App(ctk.CTk):
     """
     Main application UI and functionality. Instance of CTK Main Window.
@@ -19,6 +42,14 @@ class App(ctk.CTk):
         self.tk_image: ImageTk = None
         self.image_import: ImageImport | None = None
         self.image_output: ImageOutput | None = None
+        self.editor_menu: Menu | None = None
+        self._pending_render: str | None = None
+        # Preview output of every pipeline stage, see render_image
+        self._stage_cache: dict[str, tuple[tuple, Image.Image]] = {}
+        # (image, size) of the currently displayed self.tk_image
+        self._display_key: tuple[Image.Image | None, tuple[int, int] | None] = (None, None)
+        self._display_mode: str | None = None
+        self._canvas_item: int | None = None
 
         ctk.set_appearance_mode('System')
         ctk.set_default_color_theme('theme/custom.json')
@@ -73,13 +104,19 @@ class App(ctk.CTk):
             'effect': ctk.StringVar(value=EFFECT_OPTIONS[0]),
         }
 
-        all_vars = (
-            list(self.position_vars.values())
-            + list(self.color_vars.values())
-            + list(self.effect_vars.values())
-        )
+        self.editor_vars = self.position_vars | self.color_vars | self.effect_vars
 
-        for var in all_vars:
+        # (method, parameters, default values) of every step in each pipeline
+        # stage, steps left at their defaults are skipped when rendering
+        self.pipeline = [
+            (stage, [
+                (method, keys, [self.editor_vars[key].get() for key in keys])
+                for method, keys in steps
+            ])
+            for stage, steps in PIPELINE
+        ]
+
+        for var in self.editor_vars.values():
             var.trace('w', self.manipulate_image)
 
 
@@ -91,68 +128,108 @@ class App(ctk.CTk):
             path (str): path to the image file
         """
         self.original = Image.open(path)   # To revert back to the image
-        self.image = self.original
-        self.tk_image = ImageTk.PhotoImage(self.image)
+        self.image_stats = Metadata.get_image_stats(self.original)
+        # Downsampled copy edited interactively, the original is only
+        # processed on export
+        self.preview = self.original.copy()
+        self.preview.thumbnail(PREVIEW_SIZE)
+        self.preview_scale = self.preview.size[0] / self.original.size[0]
+        self.image = self.preview
+        self._stage_cache.clear()
         self.image_ratio = self.image.size[0] / self.image.size[1]
         self.image_import.grid_forget()    # Destroy import button to display editor
 
         self.image_output = ImageOutput(self, self.resize_image)
+        self._canvas_item = None
         self.close_button = CloseOutputButton(self, close_func=self.close_editor)
 
-        self.editor_menu = Menu(
-            self,
-            self.position_vars,
-            self.color_vars,
-            self.effect_vars,
-            self.image,
-            self.export_image,
-            self.save_thumbnail,
-        )
-
-    def manipulate_image(self, *args):
-        self.image = self.original
-        manipulator = ImageManipulator(self.image)
-
-        manipulator.rotate_image(self.position_vars['rotate'].get())
-
-        manipulator.zoom_image(self.position_vars['zoom'].get())
-
-        manipulator.flip_image(self.position_vars['flip'].get())
-
-        manipulator.apply_brightness(self.color_vars['brightness'].get())
-
-        manipulator.apply_vibrance(self.color_vars['vibrance'].get())
-
-        manipulator.apply_grayscale(self.color_vars['grayscale'].get())
-
-        try:
-            manipulator.invert_colors(self.color_vars['invert'].get())
-        except OSError:
-            messagebox.showerror("Invalid operation", "Cannot apply this operation on this type of image.")
-
-        manipulator.apply_sepia(self.color_vars['sepia'].get())
-
-        manipulator.apply_4color_filter(self.color_vars['4-color'].get())
-
-        manipulator.blur_image(self.effect_vars['blur'].get())
-
-        manipulator.change_contrast(self.effect_vars['contrast'].get())
-
-        manipulator.change_balance(self.effect_vars['balance'].get())
-
-        manipulator.change_hue(self.effect_vars['hue'].get())
+        if self.editor_menu is None:
+            self.editor_menu = Menu(
+                self,
+                self.position_vars,
+                self.color_vars,
+                self.effect_vars,
+                self.original,
+                self.image_stats,
+                self.export_image,
+                self.save_thumbnail,
+            )
+        else:   # Reuse the menu of the previously opened image
+            self.editor_menu.update_image(self.original, self.image_stats)
+            self.editor_menu.show()
+
+    def manipulate_image(self, *args) -> None:
+        """
+        Schedule a preview re-render, so that rapid changes (e.g. dragging
+        a slider) are coalesced into a single render.
+        """
+        if self._pending_render:
+            self.after_cancel(self._pending_render)
+        self._pending_render = self.after(RENDER_DELAY, self.update_preview)
 
-        manipulator.apply_effect(self.effect_vars['effect'].get())
+    def update_preview(self) -> None:
+        """
+        Apply the current editor parameters to the preview and display it.
+        """
+        self._pending_render = None
+        self.image = self.render_image(self.preview, self.preview_scale, self._stage_cache)
+        self.display_image()
 
+    def render_image(self, image: Image.Image, scale: float = 1.0,
+                     cache: dict | None = None) -> Image.Image:
+        """
+        Apply all effects and filters chosen in the editor to an image.
 
-        self.image = manipulator.image_result
-        self.display_image()
+        Args:
+            image (Image.Image): The image to process.
+            scale (float, optional): Size of ``image`` relative to the original,
+            used to scale pixel-based parameters. Defaults to 1.0.
+            cache (dict | None, optional): Output of every pipeline stage from
+            previous renders of ``image``, reused while the parameters of the
+            stage and the ones before it are unchanged. Defaults to None.
+
+        Returns:
+            Image.Image: The resulting image.
+        """
+        values = {key: var.get() for key, var in self.editor_vars.items()}
+        key = ()
+
+        for stage, steps in self.pipeline:
+            # Key of the stage covers its parameters and all the ones before it
+            key += tuple(values[param] for _, keys, _ in steps for param in keys)
+            if cache is not None and stage in cache and cache[stage][0] == key:
+                image = cache[stage][1]
+                continue
+
+            manipulator = ImageManipulator(image)
+            for method, keys, defaults in steps:
+                args = [values[param] for param in keys]
+                if args == defaults:
+                    continue
+                if scale != 1:
+                    args = [
+                        value * scale if param in PIXEL_PARAMETERS else value
+                        for param, value in zip(keys, args)
+                    ]
+                try:
+                    getattr(manipulator, method)(*args)
+                except OSError:
+                    messagebox.showerror("Invalid operation", "Cannot apply this operation on this type of image.")
+
+            image = manipulator.image_result
+            if cache is not None:
+                cache[stage] = (key, image)
+
+        return image
 
 
     def close_editor(self) -> None:
         """
         Close the editing panel and the open image.
         """
+        if self._pending_render:
+            self.after_cancel(self._pending_render)
+            self._pending_render = None
         self.image_output.grid_forget()
         self.close_button.place_forget()
         self.editor_menu.grid_forget()
@@ -187,21 +264,42 @@ class App(ctk.CTk):
         """
         Display image on the output canvas.
         """
-        self.image_output.delete('all')
-        resized_image = self.image.resize(
-            (self.image_width, self.image_height)
-        )
-        self.tk_image = ImageTk.PhotoImage(resized_image)
-        self.image_output.create_image(
-            self.canvas_width / 2,
-            self.canvas_height / 2,
-            image=self.tk_image,
-            anchor='center',
-        )
+        size = (self.image_width, self.image_height)
+        center = (self.canvas_width / 2, self.canvas_height / 2)
+        displayed_image, displayed_size = self._display_key
+
+        if self.image is not displayed_image or size != displayed_size:
+            # Cheap box reduction first, for large downscales (not
+            # supported on some modes, e.g. palette, 1-bit and 16-bit images)
+            factor = min(self.image.size[0] // size[0], self.image.size[1] // size[1])
+            source = self.image
+            if factor >= 2:
+                try:
+                    source = source.reduce(factor)
+                except ValueError:
+                    pass
+            resized_image = source.resize(size, Image.Resampling.BILINEAR)
+            if (self._canvas_item is not None and size == displayed_size
+                    and resized_image.mode == self._display_mode):
+                # Same buffer size, update the displayed pixels in place
+                self.tk_image.paste(resized_image)
+            else:
+                self.tk_image = ImageTk.PhotoImage(resized_image)
+                self._display_mode = resized_image.mode
+                if self._canvas_item is not None:
+                    self.image_output.itemconfigure(self._canvas_item, image=self.tk_image)
+            self._display_key = (self.image, size)
+
+        if self._canvas_item is None:
+            self._canvas_item = self.image_output.create_image(
+                *center, image=self.tk_image, anchor='center'
+            )
+        else:
+            self.image_output.coords(self._canvas_item, *center)
 
     def export_image(self, filename: str, extension: str, output_path: str, quality: int = 100) -> None:
         """
-        Save image to the output folder.
+        Apply all edits to the full-size image and save it to the output folder.
 
         Args:
             filename (str): name of the saved file.
@@ -209,13 +307,26 @@ class App(ctk.CTk):
             output_path (str): output folder path.
         """
         export_str = f'{output_path}/{filename}.{extension}'
-
-        OPTIMIZE = True if quality != 100 else False
-        IS_JPG = self.image.format and self.image.format.lower() in ('jpg', 'jpeg')
-        if quality == 100 and IS_JPG:
-            quality = 'keep'
-
-        self.image.save(export_str, quality=quality, optimize=OPTIMIZE)
+        image = self.render_image(self.original)
+
+        IS_JPG = extension.lower() in ('jpg', 'jpeg')
+        save_kwargs = {'quality': quality}
+
+        # Optimizing re-encodes the image, only worth it below the size limit
+        raw_size = image.size[0] * image.size[1] * len(image.getbands())
+        if quality != 100 and raw_size <= EXPORT_OPTIMIZE_LIMIT:
+            save_kwargs['optimize'] = True
+
+        if IS_JPG:
+            if quality == 100 and image.format == 'JPEG':   # Unedited JPEG
+                save_kwargs['quality'] = 'keep'
+            elif quality >= 95:
+                save_kwargs['progressive'] = True
+                save_kwargs['subsampling'] = 0
+            if image.mode not in ('1', 'L', 'RGB', 'CMYK'):
+                image = image.convert('RGB')    # JPEG has no alpha or palette
+
+        image.save(export_str, **save_kwargs)
         messagebox.showinfo(
             title='Done', message='Successfully exported image file.'
         )
@@ -229,12 +340,11 @@ class App(ctk.CTk):
             size tuple(int, int): size of the thumbnail
             output_path (str): output folder path.
         """
-        copy = self.image
-        if copy.mode == 'P':
-            copy = copy.convert('RGB')
+        # convert() returns a copy, so the thumbnail never resizes the original
+        copy = self.render_image(self.original).convert('RGB')
         export_str = f'{output_path}/{name}.jpg'
         copy.thumbnail(size)
-        copy.save(export_str)
+        copy.save(export_str, optimize=True, progressive=True)
         messagebox.showinfo(title='Done', message="Successfully created thumbnail.")
 
 
@@ -3,11 +3,21 @@ Module to create and manage editor menus.
 """
 import customtkinter as ctk
 import image_tools.metadata as Metadata
-from panel import *
-from settings import *
+from panel import (
+    ColorsPanel, DropDownPanel, ExportButton, FileNamePanel, FilePathPanel, InfoPanel,
+    RevertButton, SegmentedPanel, SliderPanel, SwitchPanel, ThumbnailPanel,
+)
+from settings import (
+    BALANCE_DEFAULT, BLUR_DEFAULT, BRIGHTNESS_DEFAULT, CONTRAST_DEFAULT, EFFECT_OPTIONS,
+    FLIP_OPTIONS, FOUR_COLOR_DEFAULT, GRAYSCALE_DEFAULT, HUE_DEFAULT, INVERT_DEFAULT,
+    ROTATE_DEFAULT, SEPIA_DEFAULT, THUMBNAIL_DEFAULT_SIZE, VIBRANCE_DEFAULT, ZOOM_DEFAULT,
+)
 from typing import Any, Callable
 from PIL.Image import Image
 
+# (EXIF & GPS string, TIFF string, image info string) by (file path, modification time)
+_META_CACHE: dict[tuple[str, float], tuple[str, str, str]] = {}
+
 
 class Menu(ctk.CTkTabview):
     """
@@ -15,11 +25,15 @@ class Menu(ctk.CTkTabview):
     """
     def __init__(
         self, parent: ctk.CTk, pos_vars: dict[Any], color_vars: dict[Any],
-        effect_vars: dict[Any], image: Image, export_func: Callable[[str, str, str],None],
+        effect_vars: dict[Any], image: Image, image_stats: dict,
+        export_func: Callable[[str, str, str],None],
         save_thumb_func: Callable[[str, str, str],None]
     ):
-        super().__init__(master=parent)
-        self.grid(row=0, column=0, sticky='nsew', padx=10, pady=10)
+        super().__init__(master=parent, command=self._on_tab_change)
+        self.show()
+        self.image_file = image
+        self.image_stats = image_stats
+        self.info_frame: InfoFrame | None = None
 
         # Tabs
         self.add('Position')
@@ -30,27 +44,81 @@ class Menu(ctk.CTkTabview):
 
         # Widgets
         PositionFrame(self.tab('Position'), pos_vars)
-        ColorFrame(self.tab('Color'), image, color_vars)
+        self.color_frame = ColorFrame(self.tab('Color'), image, color_vars)
         EffectFrame(self.tab('Effect'), effect_vars)
         ExportFrame(self.tab('Export'), export_func, save_thumb_func)
-        InfoFrame(self.tab('File'), image)
+
+    def show(self) -> None:
+        """
+        Display the menu in the editor window.
+        """
+        self.grid(row=0, column=0, sticky='nsew', padx=10, pady=10)
+
+    def update_image(self, image: Image, image_stats: dict) -> None:
+        """
+        Switch the menu to a newly opened image, reusing the existing widgets
+        instead of building a new menu.
+
+        Args:
+            image (Image): The newly opened image.
+            image_stats (dict): Stats of the image, from ``Metadata.get_image_stats``.
+        """
+        self.image_file = image
+        self.image_stats = image_stats
+        self.color_frame.update_image(image)
+        if self.info_frame is not None:
+            self.info_frame.refresh(image, image_stats)
+
+    def _on_tab_change(self) -> None:
+        """
+        Build the File tab the first time it's selected, so the image
+        metadata is only parsed if the user asks for it.
+        """
+        if self.get() == 'File' and self.info_frame is None:
+            self.info_frame = InfoFrame(self.tab('File'), self.image_file, self.image_stats)
 
 
 class InfoFrame(ctk.CTkFrame):
     """
     CTkFrame to display image EXIF, GPS, and TIFF tags (if found).
     """
-    def __init__(self, parent: ctk.CTkFrame, image: Image) -> None:
+    def __init__(self, parent: ctk.CTkFrame, image: Image, image_stats: dict) -> None:
         super().__init__(master=parent, fg_color='transparent')
         self.pack(expand=True, fill='both')
-        EXIF_STRING, TIFF_STRING = Metadata.get_metadata(image)
-        IMAGE_INFO = Metadata.get_image_info(image)
+        self.panels: dict[str, InfoPanel] = {}
+        self.refresh(image, image_stats)
+
+    def refresh(self, image: Image, image_stats: dict) -> None:
+        """
+        Display the information of an image, reusing the panels created for
+        previous images. Panels without any information are hidden.
+
+        Args:
+            image (Image): The image to display information about.
+            image_stats (dict): Stats of the image, from ``Metadata.get_image_stats``.
+        """
+        key = (image_stats['path'], image_stats['mtime'])
+        if key not in _META_CACHE:
+            _META_CACHE[key] = (*Metadata.get_metadata(image), Metadata.get_image_info(image_stats))
+        EXIF_STRING, TIFF_STRING, IMAGE_INFO = _META_CACHE[key]
 
-        InfoPanel(self, panel_name='Image Data', info_str=IMAGE_INFO, custom_box_height=130)
-        if EXIF_STRING:
-            InfoPanel(self, panel_name='EXIF & GPS Data', info_str=EXIF_STRING)
-        if TIFF_STRING:
-            InfoPanel(self, panel_name='TIFF Data', info_str=TIFF_STRING)
+        # Hide all panels, then show them again in order
+        for panel in self.panels.values():
+            panel.pack_forget()
+
+        for name, info_str, box_height in (
+            ('Image Data', IMAGE_INFO, 7),
+            ('EXIF & GPS Data', EXIF_STRING, 11),
+            ('TIFF Data', TIFF_STRING, 11),
+        ):
+            if not info_str:
+                continue
+            if name in self.panels:
+                self.panels[name].set_text(info_str)
+                self.panels[name].show()
+            else:
+                self.panels[name] = InfoPanel(self, panel_name=name, info_str=info_str,
+                                              custom_box_height=box_height)
 
 
 class PositionFrame(ctk.CTkFrame):
@@ -60,32 +128,33 @@ class PositionFrame(ctk.CTkFrame):
     def __init__(self, parent: ctk.CTkFrame, pos_vars: dict[Any]) -> None:
         super().__init__(master=parent, fg_color='transparent')
         self.pack(expand=True, fill='both')
+        rotate, zoom, flip = pos_vars['rotate'], pos_vars['zoom'], pos_vars['flip']
 
         SliderPanel(
             self,
             panel_name='Rotation',
-            data_var=pos_vars['rotate'],
+            data_var=rotate,
             min_value=0,
             max_value=360,
         )
         SliderPanel(
             self,
             panel_name='Zoom',
-            data_var=pos_vars['zoom'],
+            data_var=zoom,
             min_value=0,
             max_value=400,
         )
         SegmentedPanel(
             self,
             panel_name='Invert',
-            data_var=pos_vars['flip'],
+            data_var=flip,
             options=FLIP_OPTIONS,
         )
         RevertButton(
             self,
-            (pos_vars['rotate'], ROTATE_DEFAULT),
-            (pos_vars['zoom'], ZOOM_DEFAULT),
-            (pos_vars['flip'], FLIP_OPTIONS[0]),
+            (rotate, ROTATE_DEFAULT),
+            (zoom, ZOOM_DEFAULT),
+            (flip, FLIP_OPTIONS[0]),
         )
 
 
@@ -98,41 +167,50 @@ class ColorFrame(ctk.CTkFrame):
         super().__init__(master=parent, fg_color='transparent')
         self.pack(expand=True, fill='both')
         self.image_file = Metadata.get_image(image)
+        grayscale, sepia, invert = color_vars['grayscale'], color_vars['sepia'], color_vars['invert']
+        four_color, brightness, vibrance = color_vars['4-color'], color_vars['brightness'], color_vars['vibrance']
 
         SwitchPanel(
             self,
-            (color_vars['grayscale'], 'B/W'),
-            (color_vars['sepia'], 'Sepia'),
-            (color_vars['invert'], 'Negative'),
-            (color_vars['4-color'], '4-Color'),
+            (grayscale, 'B/W'),
+            (sepia, 'Sepia'),
+            (invert, 'Negative'),
+            (four_color, '4-Color'),
         )
         SliderPanel(
             self,
             panel_name='Brightness',
-            data_var=color_vars['brightness'],
+            data_var=brightness,
             min_value=0,
             max_value=5,
         )
         SliderPanel(
             self,
             panel_name='Vibrance',
-            data_var=color_vars['vibrance'],
+            data_var=vibrance,
             min_value=0,
             max_value=5,
         )
 
-        ColorsPanel(self, self.image_file)
+        self.colors_panel = ColorsPanel(self, self.image_file)
 
         RevertButton(
             self,
-            (color_vars['grayscale'], GRAYSCALE_DEFAULT),
-            (color_vars['sepia'], SEPIA_DEFAULT),
-            (color_vars['invert'], INVERT_DEFAULT),
-            (color_vars['4-color'], FOUR_COLOR_DEFAULT),
-            (color_vars['brightness'], BRIGHTNESS_DEFAULT),
-            (color_vars['vibrance'], VIBRANCE_DEFAULT),
+            (grayscale, GRAYSCALE_DEFAULT),
+            (sepia, SEPIA_DEFAULT),
+            (invert, INVERT_DEFAULT),
+            (four_color, FOUR_COLOR_DEFAULT),
+            (brightness, BRIGHTNESS_DEFAULT),
+            (vibrance, VIBRANCE_DEFAULT),
         )
 
+    def update_image(self, image: Image) -> None:
+        """
+        Switch the color extraction to a newly opened image.
+        """
+        self.image_file = Metadata.get_image(image)
+        self.colors_panel.update_image(self.image_file)
+
 
 class EffectFrame(ctk.CTkFrame):
     """
@@ -142,46 +220,48 @@ class EffectFrame(ctk.CTkFrame):
     def __init__(self, parent: ctk.CTkFrame, effect_vars: dict[Any]) -> None:
         super().__init__(master=parent, fg_color='transparent')
         self.pack(expand=True, fill='both')
+        effect, blur, contrast = effect_vars['effect'], effect_vars['blur'], effect_vars['contrast']
+        balance, hue = effect_vars['balance'], effect_vars['hue']
 
         DropDownPanel(
-            self, data_var=effect_vars['effect'], options=EFFECT_OPTIONS
+            self, data_var=effect, options=EFFECT_OPTIONS
         )
         SliderPanel(
             self,
             panel_name='Blur',
-            data_var=effect_vars['blur'],
+            data_var=blur,
             min_value=0,
             max_value=30,
         )
         SliderPanel(
             self,
             panel_name='Contrast',
-            data_var=effect_vars['contrast'],
+            data_var=contrast,
             min_value=0,
             max_value=10,
         )
         SliderPanel(
             self,
             panel_name='Balance',
-            data_var=effect_vars['balance'],
+            data_var=balance,
             min_value=0,
             max_value=10,
         )
         SliderPanel(
             self,
             panel_name='Hue',
-            data_var=effect_vars['hue'],
+            data_var=hue,
             min_value=-100,
             max_value=100,
         )
 
         RevertButton(
             self,
-            (effect_vars['effect'], EFFECT_OPTIONS[0]),
-            (effect_vars['blur'], BLUR_DEFAULT),
-            (effect_vars['contrast'], CONTRAST_DEFAULT),
-            (effect_vars['balance'], BALANCE_DEFAULT),
-            (effect_vars['hue'], HUE_DEFAULT),
+            (effect, EFFECT_OPTIONS[0]),
+            (blur, BLUR_DEFAULT),
+            (contrast, CONTRAST_DEFAULT),
+            (balance, BALANCE_DEFAULT),
+            (hue, HUE_DEFAULT),
         )
 
 
@@ -200,8 +280,8 @@ class ExportFrame(ctk.CTkFrame):
 
         self.thumbnail_name = ctk.StringVar()
         self.thumbnail_path = ctk.StringVar()
-        self.thumbnail_width = ctk.IntVar(value=200)
-        self.thumbnail_height = ctk.IntVar(value=200)
+        self.thumbnail_width = ctk.StringVar(value=str(THUMBNAIL_DEFAULT_SIZE))
+        self.thumbnail_height = ctk.StringVar(value=str(THUMBNAIL_DEFAULT_SIZE))
 
         FileNamePanel(self, self.file_name, self.file_extension, self.quality)
         FilePathPanel(self, self.path)
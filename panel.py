@@ -2,11 +2,13 @@
 Reusable panel components, used throughout the app to display editor widgets.
 """
 from typing import Callable, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+import tkinter
 import customtkinter as ctk
-import colorgram
 from tkinter import filedialog, messagebox, END
 from settings import *
 from color_tools import hex_tools as HEX
+from color_tools.palette import extract_palette
 from PIL.Image import Image
 
 
@@ -25,6 +27,12 @@ class CardPanel(ctk.CTkFrame):
     """
     def __init__(self, parent: ctk.CTkFrame) -> None:
         super().__init__(master=parent, fg_color=PANEL_BG)
+        self.show()
+
+    def show(self) -> None:
+        """
+        Display the card in its parent frame.
+        """
         self.pack(fill='both', pady=4, ipady=8)
 
 
@@ -43,12 +51,16 @@ class SliderPanel(Panel):
         self.columnconfigure((0, 1), weight=1)
 
         self.panel_var = data_var
-        self.panel_var.trace('w', self.update_text)
+        self.panel_var.trace('w', self.schedule_update)
+        self._pending = False
+        # Label text is bound to a variable, updating it skips widget configure
+        self._shown_value = round(data_var.get(), 2)
+        self._text_var = ctk.StringVar(value=f'{self._shown_value}')
 
         ctk.CTkLabel(self, text=panel_name).grid(
             row=0, column=0, sticky='W', padx=10
         )
-        self.num_label = ctk.CTkLabel(self, text=data_var.get())
+        self.num_label = ctk.CTkLabel(self, textvariable=self._text_var)
         self.num_label.grid(row=0, column=1, sticky='E', padx=10)
 
         ctk.CTkSlider(
@@ -59,11 +71,27 @@ class SliderPanel(Panel):
             to=max_value,
         ).grid(row=1, column=0, columnspan=2, sticky='ew', padx=10, pady=5)
 
+    def schedule_update(self, *args):
+        """
+        Update the label once Tk is idle, so that all slider moves handled
+        in the same event loop cycle result in a single update.
+        """
+        if not self._pending:
+            self._pending = True
+            self.after_idle(self._flush)
+
+    def _flush(self):
+        self._pending = False
+        self.update_text()
+
     def update_text(self, *args):
         """
         Update SliderPanel label to match the slider's value.
         """
-        self.num_label.configure(text=f'{round(self.panel_var.get(), 2)}')
+        value = round(self.panel_var.get(), 2)
+        if value != self._shown_value:
+            self._shown_value = value
+            self._text_var.set(f'{value}')
 
 
 class SegmentedPanel(Panel):
@@ -71,7 +99,7 @@ class SegmentedPanel(Panel):
     Panel with multiple grouped button using ctk.CTkSegmentedButton.
     """
     def __init__(self, parent: ctk.CTkFrame, panel_name: str, data_var: ctk.Variable,
-                       options: list[str]) -> None:
+                       options: tuple[str, ...]) -> None:
         super().__init__(parent=parent)
         ctk.CTkLabel(self, text=panel_name).pack()
         ctk.CTkSegmentedButton(self, variable=data_var,
@@ -205,53 +233,76 @@ class ThumbnailPanel(Panel):
     def __init__(self, parent: ctk.CTkFrame,
                  thumb_name: ctk.StringVar,
                  thumb_path: ctk.StringVar,
-                 size: tuple[ctk.IntVar, ctk.IntVar],
+                 size: tuple[ctk.StringVar, ctk.StringVar],
                  save_thumb_func: Callable[[str, tuple[int, int], str], None]
         ) -> None:
 
         super().__init__(parent=parent)
-        self.configure(height=200)
         self.thumb_name = thumb_name
         self.thumb_path = thumb_path
         self.thumb_width = size[0]
         self.thumb_height = size[1]
         self.save_thumb_func = save_thumb_func
 
-        ctk.CTkLabel(self, text='Create thumbnail').place(relx=0.02, rely=0.01)
-
-        ctk.CTkLabel(self, text='Width').place(relx=0.10, rely=0.18)
-        ctk.CTkEntry(self, width=100, textvariable=self.thumb_width).place(relx=0.10, rely=0.30)
-
-        ctk.CTkLabel(self, text='x').place(relx=0.485, rely=0.30)
+        # Layout
+        self.columnconfigure((0, 1, 2), weight=1)
 
-        ctk.CTkLabel(self, text='Height').place(relx=0.55, rely=0.18)
-        ctk.CTkEntry(self, width=100, textvariable=self.thumb_height).place(relx=0.55, rely=0.30)
+        ctk.CTkLabel(self, text='Create thumbnail').grid(
+            row=0, column=0, columnspan=3, sticky='W', padx=10
+        )
 
-        ctk.CTkLabel(self, text='Thumbnail name:').place(relx=0.02, rely=0.58)
-        ctk.CTkEntry(self, width=270, textvariable=self.thumb_name).place(relx=0.02, rely=0.70)
+        ctk.CTkLabel(self, text='Width').grid(row=1, column=0)
+        ctk.CTkLabel(self, text='Height').grid(row=1, column=2)
+        ctk.CTkLabel(self, text='x').grid(row=2, column=1)
+        for column, size_var in ((0, self.thumb_width), (2, self.thumb_height)):
+            # Sizes are only validated once the entry loses focus, not per keystroke
+            entry = ctk.CTkEntry(self, width=100, textvariable=size_var)
+            entry.bind('<FocusOut>', lambda event, var=size_var: self._validate_size(var))
+            entry.grid(row=2, column=column)
+
+        ctk.CTkLabel(self, text='Thumbnail name:').grid(
+            row=3, column=0, columnspan=3, sticky='W', padx=10, pady=(10, 0)
+        )
+        ctk.CTkEntry(self, textvariable=self.thumb_name).grid(
+            row=4, column=0, columnspan=3, sticky='ew', padx=10
+        )
         ctk.CTkButton(
             self,
             text='Save thumbnail to folder...',
-            width=270,
             command=self.save_thumbnail_to,
-        ).place(relx=0.02, rely=0.85)
+        ).grid(row=5, column=0, columnspan=3, sticky='ew', padx=10, pady=(10, 0))
 
     def save_thumbnail_to(self) -> None:
         """
         Ask user to select the output directory to export thumbnail to.
         """
         self.thumb_path.set(filedialog.askdirectory())
-        size = (self.thumb_width.get(), self.thumb_height.get())
+        size = (self._validate_size(self.thumb_width), self._validate_size(self.thumb_height))
         self.save_thumb_func(self.thumb_name.get(), size,
                              self.thumb_path.get()
         )
 
+    def _validate_size(self, size_var: ctk.StringVar) -> int:
+        """
+        Parse a thumbnail size entry, clamped to [1, ``THUMBNAIL_MAX_SIZE``].
+        Invalid input is replaced with the default size.
+
+        Returns:
+            int: The validated size, also written back to the entry.
+        """
+        try:
+            size = min(max(int(size_var.get()), 1), THUMBNAIL_MAX_SIZE)
+        except ValueError:
+            size = THUMBNAIL_DEFAULT_SIZE
+        size_var.set(str(size))
+        return size
+
 
 class DropDownPanel(ctk.CTkOptionMenu):
     """
     Panel with a drop-down menu.
     """
-    def __init__(self, parent: ctk.CTkFrame, data_var: ctk.Variable, options: list[str]) -> None:
+    def __init__(self, parent: ctk.CTkFrame, data_var: ctk.Variable, options: tuple[str, ...]) -> None:
         super().__init__(
             master=parent,
             values=options,
@@ -269,7 +320,7 @@ class InfoPanel(CardPanel):
     Card that displays information, with a header label.
     """
     def __init__(self, parent: ctk.CTkFrame, panel_name: str, info_str: str,
-                 custom_box_height: int = 200) -> None:
+                 custom_box_height: int = 11) -> None:   # box height in lines of text
         super().__init__(parent=parent)
 
         # Layout
@@ -280,53 +331,103 @@ class InfoPanel(CardPanel):
             self, text=panel_name, font=('Open Sans', 13, 'bold')
         ).grid(row=0, column=0, sticky='W', padx=10)
 
-        self.info = ctk.CTkTextbox(master=self, fg_color=PANEL_BG, height=custom_box_height)
-        self.info.insert('0.0', info_str)
+        # Read-only text needs no CTk theming, a plain Text skips the CTkTextbox canvas
+        self.info = tkinter.Text(self, bg=PANEL_BG, fg=INFO_TEXT_COLOR, relief='flat',
+                                 borderwidth=0, highlightthickness=0, wrap='word',
+                                 padx=10, height=custom_box_height)
+        self.info.insert('1.0', info_str)
         self.info.configure(state='disabled')
         self.info.grid(row=1, column=0, columnspan=2, sticky='ew')
 
+    def set_text(self, info_str: str) -> None:
+        """
+        Replace the displayed information, reusing the existing textbox.
+        """
+        self.info.configure(state='normal')
+        self.info.delete('1.0', END)
+        self.info.insert('1.0', info_str)
+        self.info.configure(state='disabled')
+
 
 class ColorsPanel(CardPanel):
     """
     Card to display extracted colors from the image.
     """
+    _pool = ThreadPoolExecutor(max_workers=1)   # Shared palette extraction worker
+
     def __init__(self, parent: ctk.CTkFrame, image_file: Image):
         super().__init__(parent=parent)
         self.image = image_file
         self.hex_colors = []
+        self._future: Future | None = None    # Extraction for the current image
         self.run_button = ctk.CTkButton(self, corner_radius=8,
                                         text='Extract colors from image',
-                                        command=self.generate_palette).pack(expand=True, fill='x', padx=10)
+                                        command=self.generate_palette)
+        self.run_button.pack(expand=True, fill='x', padx=10)
         self.frame = ctk.CTkFrame(self, fg_color='transparent')
+        self._buttons: list[ctk.CTkButton] = []   # Reused between palettes
 
 
     def generate_palette(self):
         """
-        Extract the top 14 most frequent colors from the open image.
+        Extract the top 14 most frequent colors from the open image,
+        in a background thread to keep the editor responsive.
+        """
+        self.run_button.configure(state='disabled')
+        future = self._future = self._pool.submit(extract_palette, self.image.filename, 14)
+        self.after(PALETTE_POLL_DELAY, self._apply_palette, future)
+
+    def update_image(self, image_file: Image) -> None:
+        """
+        Switch to a newly opened image, removing the previous image's colors.
         """
-        colors = colorgram.extract(self.image.filename, 2**32)
-        colors = sorted(colors, key=lambda color: color.proportion)[:14]
-        self.hex_colors = [HEX.rgb_to_hex(color.rgb.r, color.rgb.g, color.rgb.b) for color in colors]
+        self.image = image_file
+        self.hex_colors = []
+        self._future = None
+        self.run_button.configure(state='normal')
+        for button in self._buttons:
+            button.grid_forget()
+        self.frame.pack_forget()
+
+    def _apply_palette(self, future: Future):
+        """
+        Display the extracted colors once the extraction is done. Runs on the
+        Tk main thread, since widgets can't be updated from the worker thread.
+        """
+        if future is not self._future:    # Another image was opened since
+            return
+        if not future.done():
+            self.after(PALETTE_POLL_DELAY, self._apply_palette, future)
+            return
+
+        self.run_button.configure(state='normal')
+        self.hex_colors = future.result()
         self.draw_colors()
 
     def draw_colors(self):
         """
         Display extracted colors on the panel.
         """
-        self.frame.grid_forget()
         self.frame.pack(expand=True, fill='both', pady=10, padx=5)
 
+        # Only create the buttons missing from previous palettes
+        while len(self._buttons) < len(self.hex_colors):
+            self._buttons.append(ctk.CTkButton(self.frame, corner_radius=14, width=125, height=18,
+                                               text_color=WHITE))
+
+        hover_colors = [HEX.colorscale(color, 0.5) for color in self.hex_colors]
+
         row, col = 0, 0
-        for color in self.hex_colors:
-            ctk.CTkButton(self.frame, corner_radius=14, width=125, height=18,
-                          text=str(color),
-                          fg_color=color,
-                          text_color=WHITE,
-                          hover_color=HEX.colorscale(color, 0.5)).grid(row=row, column=col, padx=5, pady=2)
+        for button, color, hover_color in zip(self._buttons, self.hex_colors, hover_colors):
+            button.configure(text=str(color), fg_color=color, hover_color=hover_color)
+            button.grid(row=row, column=col, padx=5, pady=2)
 
             col += 1
             if col > 1: col, row = 0, row + 1
 
+        for button in self._buttons[len(self.hex_colors):]:
+            button.grid_forget()
+
 
 class ButtonPanel(CardPanel):
     """
@@ -343,16 +444,17 @@ class RevertButton(ctk.CTkButton):
     """
     Button used to revert (undo) all effects used in its frame.
     """
-    def __init__(self, parent: ctk.CTkFrame, *args) -> None:
+    def __init__(self, parent: ctk.CTkFrame, *args) -> None:   # args: ((var1, default1), ...)
         super().__init__(master=parent, text='Revert', command=self.reset_vars)
         self.pack(side='bottom', pady=10)
-        self.button_args = args
+        self._vars = [tk_var for tk_var, _ in args]
+        self._defaults = [default_val for _, default_val in args]
 
     def reset_vars(self):
         """
         Reset the values of all provided variables to defaults.
         """
-        for tk_var, default_val in self.button_args:
+        for tk_var, default_val in zip(self._vars, self._defaults):
             tk_var.set(default_val)
 
 
@@ -4,31 +4,49 @@ Global values and flags used across the application.
 
 import darkdetect
 
+# Detect the system theme once, each darkdetect call queries the OS. Compared
+# separately, since the theme is None (neither dark nor light) when unknown
+_THEME = darkdetect.theme()
+_IS_DARK = _THEME == 'Dark'
+_IS_LIGHT = _THEME == 'Light'
+
 ROTATE_DEFAULT = 0
 ZOOM_DEFAULT = 0
-FLIP_OPTIONS = ['None', 'X', 'Y', 'Both']
+FLIP_OPTIONS = ('None', 'X', 'Y', 'Both')
 BLUR_DEFAULT = 0
 CONTRAST_DEFAULT = 0
+CONTRAST_STEP = 0.2     # contrast factor added per contrast slider step
 BALANCE_DEFAULT = 0
-EFFECT_OPTIONS = ['None', 'Emboss', 'Find edges', 'Contour', 'Edge enhance']
-THEME_OPTIONS = ['Light', 'Dark', 'System']
+EFFECT_OPTIONS = ('None', 'Emboss', 'Find edges', 'Contour', 'Edge enhance')
+THEME_OPTIONS = ('Light', 'Dark', 'System')
 BRIGHTNESS_DEFAULT = 1
 VIBRANCE_DEFAULT = 1
 HUE_DEFAULT = 0
 GRAYSCALE_DEFAULT = False
 SEPIA_DEFAULT = False
 FOUR_COLOR_DEFAULT = False
+FOUR_COLOR_METHOD = 'FASTOCTREE'    # Pillow quantize method used by the 4-color filter
+FOUR_COLOR_DITHER = False           # Apply Floyd-Steinberg dithering in the 4-color filter
 INVERT_DEFAULT = False
+# ----------------------------- RENDERING -----------------------
+RENDER_DELAY = 60              # ms to wait for more changes before re-rendering
+PREVIEW_SIZE = (1600, 1600)    # max size of the image edited interactively
+EXPORT_OPTIMIZE_LIMIT = 2 * 1024 * 1024    # raw bytes above which exports skip optimize
+PALETTE_POLL_DELAY = 50        # ms between checks for a finished color palette
+# ----------------------------- EXPORT --------------------------
+THUMBNAIL_DEFAULT_SIZE = 200   # default thumbnail width and height
+THUMBNAIL_MAX_SIZE = 8192      # max thumbnail width and height
 # ----------------------------- COLORS --------------------------
 WHITE = '#FFF'
 GREY = 'grey'
-DARK_GREY = '#212121' if darkdetect.isDark() else "gray70"
-CANVAS_BACKGROUND = '#242424' if darkdetect.isDark() else "gray95"
-CLOSE_BUTTON_COLOR = '#242424' if darkdetect.isLight() else "gray95"
+DARK_GREY = '#212121' if _IS_DARK else "gray70"
+CANVAS_BACKGROUND = '#242424' if _IS_DARK else "gray95"
+CLOSE_BUTTON_COLOR = '#242424' if _IS_LIGHT else "gray95"
 BLUE = '#1F6AA5'
 CLOSE_RED = '#8a0606'
 SLIDER_BG = '#64686b'
-PANEL_BG = '#181818' if darkdetect.isDark() else "gray75"
+PANEL_BG = '#181818' if _IS_DARK else "gray75"
+INFO_TEXT_COLOR = 'gray90' if _IS_DARK else "gray10"
 DROPDOWN_MAIN_COLOR = '#444'
 DROPDOWN_HOVER_COLOR = '#333'
 DROPDOWN_MENU_COLOR = '#666'
@@ -36,7 +54,7 @@ DROPDOWN_MENU_COLOR = '#666'
 BACKGROUND_PRIMARY = "#131c22"
 BACKGROUND_SECONDARY = "#2C394B"
 BACKGROUND_TERNARY = "#334756"
-THEME_COLOR = "#FF4C29" if darkdetect.isDark() else "#2F58CD"
-THEME_GRADIENT = "#ff401a" if darkdetect.isDark() else "#172c66"
-THEME_HOVER = "#ff2b00" if darkdetect.isDark() else "#1c347b"
-THEME_HOVER_GRADIENT = "#e62600" if darkdetect.isDark() else "#162962"
\ No newline at end of file
+THEME_COLOR = "#FF4C29" if _IS_DARK else "#2F58CD"
+THEME_GRADIENT = "#ff401a" if _IS_DARK else "#172c66"
+THEME_HOVER = "#ff2b00" if _IS_DARK else "#1c347b"
+THEME_HOVER_GRADIENT = "#e62600" if _IS_DARK else "#162962"
\ No newline at end of file